@@ -12,11 +12,28 @@ Includes:
 - Field of view
 - Pathfinding
 - Map generation
+- Array-backed grid storage
 """
 
+import bisect
+import heapq
 import math
-from collections import deque
-from typing import List, Tuple, Dict, Set
+from functools import lru_cache
+from typing import List, Tuple, Dict, Set, Union
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional; without it the kernels below run as plain Python
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Define hex coordinate types
 AxialHex = Tuple[int, int]
@@ -55,6 +72,11 @@ CUBE_DIRECTIONS = [
     (-1, 0, 1), (-1, 1, 0), (0, 1, -1)
 ]
 
+# Direction vector components, for broadcasting over grid arrays
+CUBE_DIRS_Q = np.array([d[0] for d in CUBE_DIRECTIONS], dtype=np.int32)
+CUBE_DIRS_R = np.array([d[1] for d in CUBE_DIRECTIONS], dtype=np.int32)
+CUBE_DIRS_S = np.array([d[2] for d in CUBE_DIRECTIONS], dtype=np.int32)
+
 # ======================
 # Coordinate Conversions
 # ======================
@@ -70,6 +92,7 @@ def cube_to_axial(hex: CubeHex) -> AxialHex:
     q, r, s = hex
     return (q, r)
 
+@lru_cache(maxsize=65536)
 def cube_to_oddr(hex: CubeHex) -> OffsetHex:
     """Convert cube coordinates to odd-r offset coordinates."""
     q, r, s = hex
@@ -77,6 +100,7 @@ def cube_to_oddr(hex: CubeHex) -> OffsetHex:
     row = r
     return (col, row)
 
+@lru_cache(maxsize=65536)
 def oddr_to_cube(hex: OffsetHex) -> CubeHex:
     """Convert odd-r offset coordinates to cube coordinates."""
     col, row = hex
@@ -85,6 +109,7 @@ def oddr_to_cube(hex: OffsetHex) -> CubeHex:
     s = -q - r
     return (q, r, s)
 
+@lru_cache(maxsize=65536)
 def cube_to_evenr(hex: CubeHex) -> OffsetHex:
     """Convert cube coordinates to even-r offset coordinates."""
     q, r, s = hex
@@ -92,6 +117,7 @@ def cube_to_evenr(hex: CubeHex) -> OffsetHex:
     row = r
     return (col, row)
 
+@lru_cache(maxsize=65536)
 def evenr_to_cube(hex: OffsetHex) -> CubeHex:
     """Convert even-r offset coordinates to cube coordinates."""
     col, row = hex
@@ -100,6 +126,7 @@ def evenr_to_cube(hex: OffsetHex) -> CubeHex:
     s = -q - r
     return (q, r, s)
 
+@lru_cache(maxsize=65536)
 def cube_to_oddq(hex: CubeHex) -> OffsetHex:
     """Convert cube coordinates to odd-q offset coordinates."""
     q, r, s = hex
@@ -107,6 +134,7 @@ def cube_to_oddq(hex: CubeHex) -> OffsetHex:
     row = r + (q - (q & 1)) // 2
     return (col, row)
 
+@lru_cache(maxsize=65536)
 def oddq_to_cube(hex: OffsetHex) -> CubeHex:
     """Convert odd-q offset coordinates to cube coordinates."""
     col, row = hex
@@ -115,6 +143,7 @@ def oddq_to_cube(hex: OffsetHex) -> CubeHex:
     s = -q - r
     return (q, r, s)
 
+@lru_cache(maxsize=65536)
 def cube_to_evenq(hex: CubeHex) -> OffsetHex:
     """Convert cube coordinates to even-q offset coordinates."""
     q, r, s = hex
@@ -122,6 +151,7 @@ def cube_to_evenq(hex: CubeHex) -> OffsetHex:
     row = r + (q + (q & 1)) // 2
     return (col, row)
 
+@lru_cache(maxsize=65536)
 def evenq_to_cube(hex: OffsetHex) -> CubeHex:
     """Convert even-q offset coordinates to cube coordinates."""
     col, row = hex
@@ -130,6 +160,61 @@ def evenq_to_cube(hex: OffsetHex) -> CubeHex:
     s = -q - r
     return (q, r, s)
 
+# Offset type dispatch tables
+_OFFSET_TO_CUBE = {
+    'odd-r': oddr_to_cube,
+    'even-r': evenr_to_cube,
+    'odd-q': oddq_to_cube,
+    'even-q': evenq_to_cube
+}
+
+_CUBE_TO_OFFSET = {
+    'odd-r': cube_to_oddr,
+    'even-r': cube_to_evenr,
+    'odd-q': cube_to_oddq,
+    'even-q': cube_to_evenq
+}
+
+# Per offset type: which column holds the shifted axis (0 = col for -q, 1 = row
+# for -r) and the parity sign (-1 odd, +1 even)
+_OFFSET_ARRAY_LAYOUT = {
+    'odd-r': (1, -1),
+    'even-r': (1, 1),
+    'odd-q': (0, -1),
+    'even-q': (0, 1)
+}
+
+def _offset_to_cube_array(hexes: np.ndarray, offset_type: str) -> np.ndarray:
+    """Convert a (K, 2) array of offset hexes to a (K, 3) int32 array of cube hexes."""
+    try:
+        axis, sign = _OFFSET_ARRAY_LAYOUT[offset_type]
+    except KeyError:
+        raise ValueError("Invalid offset type") from None
+    
+    hexes = np.asarray(hexes, dtype=np.int32).reshape(-1, 2)
+    col, row = hexes[:, 0], hexes[:, 1]
+    if axis == 1:
+        q = col - (row + sign * (row & 1)) // 2
+        r = row
+    else:
+        q = col
+        r = row - (col + sign * (col & 1)) // 2
+    return np.column_stack((q, r, -q - r))
+
+def _cube_obstacles(obstacles, offset_type: str) -> Set[CubeHex]:
+    """Convert offset obstacles, given as a set of tuples or a (K, 2) array, to a cube set."""
+    if isinstance(obstacles, np.ndarray):
+        return set(zip(*_offset_to_cube_array(obstacles, offset_type).T.tolist()))
+    to_cube, _ = _offset_converters(offset_type)
+    return {to_cube(hex) for hex in obstacles}
+
+def _offset_converters(offset_type: str):
+    """Get the (to_cube, from_cube) conversion functions for an offset type."""
+    try:
+        return _OFFSET_TO_CUBE[offset_type], _CUBE_TO_OFFSET[offset_type]
+    except KeyError:
+        raise ValueError("Invalid offset type") from None
+
 # ==============
 # Hex Arithmetic
 # ==============
@@ -162,7 +247,10 @@ def cube_rotate_right(hex: CubeHex) -> CubeHex:
 
 def cube_distance(a: CubeHex, b: CubeHex) -> int:
     """Calculate the distance between two cube hex coordinates."""
-    return (abs(a[0] - b[0]) + abs(a[1] - b[1]) + abs(a[2] - b[2])) // 2
+    # Since q + r + s == 0, ds == -(dq + dr) and the distance is the largest |d|
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return max(abs(dq), abs(dr), abs(dq + dr))
 
 def axial_distance(a: AxialHex, b: AxialHex) -> int:
     """Calculate the distance between two axial hex coordinates."""
@@ -172,21 +260,8 @@ def axial_distance(a: AxialHex, b: AxialHex) -> int:
 
 def offset_distance(a: OffsetHex, b: OffsetHex, offset_type: str = 'odd-r') -> int:
     """Calculate the distance between two offset hex coordinates."""
-    if offset_type == 'odd-r':
-        ac = oddr_to_cube(a)
-        bc = oddr_to_cube(b)
-    elif offset_type == 'even-r':
-        ac = evenr_to_cube(a)
-        bc = evenr_to_cube(b)
-    elif offset_type == 'odd-q':
-        ac = oddq_to_cube(a)
-        bc = oddq_to_cube(b)
-    elif offset_type == 'even-q':
-        ac = evenq_to_cube(a)
-        bc = evenq_to_cube(b)
-    else:
-        raise ValueError("Invalid offset type")
-    return cube_distance(ac, bc)
+    to_cube, _ = _offset_converters(offset_type)
+    return cube_distance(to_cube(a), to_cube(b))
 
 # ================
 # Neighbor Finding
@@ -204,66 +279,105 @@ def axial_neighbor(hex: AxialHex, direction: int) -> AxialHex:
 
 def offset_neighbor(hex: OffsetHex, direction: int, offset_type: str = 'odd-r') -> OffsetHex:
     """Get the neighbor of an offset hex in the specified direction (0-5)."""
-    if offset_type == 'odd-r':
-        cube = oddr_to_cube(hex)
-    elif offset_type == 'even-r':
-        cube = evenr_to_cube(hex)
-    elif offset_type == 'odd-q':
-        cube = oddq_to_cube(hex)
-    elif offset_type == 'even-q':
-        cube = evenq_to_cube(hex)
-    else:
-        raise ValueError("Invalid offset type")
-    
-    neighbor = cube_neighbor(cube, direction)
-    
-    if offset_type == 'odd-r':
-        return cube_to_oddr(neighbor)
-    elif offset_type == 'even-r':
-        return cube_to_evenr(neighbor)
-    elif offset_type == 'odd-q':
-        return cube_to_oddq(neighbor)
-    elif offset_type == 'even-q':
-        return cube_to_evenq(neighbor)
+    to_cube, from_cube = _offset_converters(offset_type)
+    return from_cube(cube_neighbor(to_cube(hex), direction))
 
-def cube_neighbors(hex: CubeHex) -> List[CubeHex]:
+@lru_cache(maxsize=1 << 17)
+def cube_neighbors(hex: CubeHex) -> Tuple[CubeHex, ...]:
     """Get all six neighbors of a cube hex."""
-    return [cube_neighbor(hex, dir) for dir in range(6)]
+    return tuple(cube_add(hex, d) for d in CUBE_DIRECTIONS)
 
-def axial_neighbors(hex: AxialHex) -> List[AxialHex]:
+@lru_cache(maxsize=1 << 17)
+def axial_neighbors(hex: AxialHex) -> Tuple[AxialHex, ...]:
     """Get all six neighbors of an axial hex."""
-    return [axial_neighbor(hex, dir) for dir in range(6)]
+    return tuple(axial_neighbor(hex, dir) for dir in range(6))
 
 def offset_neighbors(hex: OffsetHex, offset_type: str = 'odd-r') -> List[OffsetHex]:
     """Get all six neighbors of an offset hex."""
     return [offset_neighbor(hex, dir, offset_type) for dir in range(6)]
 
+# ===========
+# Packed Keys
+# ===========
+
+# A cube hex packs into one int: (q + bias) in the high 32 bits, (r + bias) in
+# the low 32 (s is redundant). With the bias both halves stay non-negative, so
+# stepping to a neighbor is a single add and keys sort like (q, r, s) tuples.
+_PACK_BIAS = 1 << 31
+_PACK_MASK = 0xFFFFFFFF
+_PACKED_DIRECTIONS = tuple((d[0] << 32) + d[1] for d in CUBE_DIRECTIONS)
+
+def pack(q: int, r: int) -> int:
+    """Pack the q, r components of a cube hex into a single int key."""
+    return ((q + _PACK_BIAS) << 32) | (r + _PACK_BIAS)
+
+def unpack(key: int) -> CubeHex:
+    """Unpack an int key back into a cube hex."""
+    q = (key >> 32) - _PACK_BIAS
+    r = (key & _PACK_MASK) - _PACK_BIAS
+    return (q, r, -q - r)
+
+def cube_neighbors_packed(key: int) -> Tuple[int, ...]:
+    """Get the packed keys of all six neighbors of a packed hex."""
+    return tuple(key + d for d in _PACKED_DIRECTIONS)
+
+def _pack_hexes(hexes) -> frozenset:
+    """Pack an iterable of cube hexes into a frozenset of int keys."""
+    return frozenset([((q + _PACK_BIAS) << 32) | (r + _PACK_BIAS) for q, r, _ in hexes])
+
 # =============
 # Range Finding
 # =============
 
+# Ring and spiral offsets around the origin, keyed by radius
+_RING_CACHE: Dict[int, List[CubeHex]] = {}
+_SPIRAL_CACHE: Dict[int, List[CubeHex]] = {}
+_PACKED_RING_CACHE: Dict[int, List[int]] = {}
+
+def _ring_offsets(radius: int) -> List[CubeHex]:
+    """Get the ring offsets around the origin at the given radius (cached)."""
+    offsets = _RING_CACHE.get(radius)
+    if offsets is None:
+        offsets = []
+        # Start at the top and rotate right
+        hex = cube_scale(CUBE_DIRECTIONS[4], radius)
+        for i in range(6):
+            for j in range(radius):
+                offsets.append(hex)
+                hex = cube_neighbor(hex, i)
+        _RING_CACHE[radius] = offsets
+    return offsets
+
+def _spiral_offsets(radius: int) -> List[CubeHex]:
+    """Get the spiral offsets around the origin up to the given radius (cached)."""
+    offsets = _SPIRAL_CACHE.get(radius)
+    if offsets is None:
+        offsets = [(0, 0, 0)]
+        for k in range(1, radius + 1):
+            offsets.extend(_ring_offsets(k))
+        _SPIRAL_CACHE[radius] = offsets
+    return offsets
+
+def _packed_ring_offsets(radius: int) -> List[int]:
+    """Get the ring offsets at the given radius as deltas to add to packed keys (cached)."""
+    offsets = _PACKED_RING_CACHE.get(radius)
+    if offsets is None:
+        offsets = [(o[0] << 32) + o[1] for o in _ring_offsets(radius)]
+        _PACKED_RING_CACHE[radius] = offsets
+    return offsets
+
 def cube_ring(center: CubeHex, radius: int) -> List[CubeHex]:
     """Get all hexes in a ring around the center at the given radius."""
     if radius == 0:
         return [center]
     
-    results = []
-    # Start at the top and rotate right
-    hex = cube_add(center, cube_scale(CUBE_DIRECTIONS[4], radius))
-    
-    for i in range(6):
-        for j in range(radius):
-            results.append(hex)
-            hex = cube_neighbor(hex, i)
-    
-    return results
+    q, r, s = center
+    return [(q + o[0], r + o[1], s + o[2]) for o in _ring_offsets(radius)]
 
 def cube_spiral(center: CubeHex, radius: int) -> List[CubeHex]:
     """Get all hexes in a spiral around the center up to the given radius."""
-    results = [center]
-    for k in range(1, radius + 1):
-        results.extend(cube_ring(center, k))
-    return results
+    q, r, s = center
+    return [(q + o[0], r + o[1], s + o[2]) for o in _spiral_offsets(radius)]
 
 def axial_ring(center: AxialHex, radius: int) -> List[AxialHex]:
     """Get all hexes in a ring around the center at the given radius (axial)."""
@@ -277,37 +391,13 @@ def axial_spiral(center: AxialHex, radius: int) -> List[AxialHex]:
 
 def offset_ring(center: OffsetHex, radius: int, offset_type: str = 'odd-r') -> List[OffsetHex]:
     """Get all hexes in a ring around the center at the given radius (offset)."""
-    if offset_type == 'odd-r':
-        cube_center = oddr_to_cube(center)
-        return [cube_to_oddr(hex) for hex in cube_ring(cube_center, radius)]
-    elif offset_type == 'even-r':
-        cube_center = evenr_to_cube(center)
-        return [cube_to_evenr(hex) for hex in cube_ring(cube_center, radius)]
-    elif offset_type == 'odd-q':
-        cube_center = oddq_to_cube(center)
-        return [cube_to_oddq(hex) for hex in cube_ring(cube_center, radius)]
-    elif offset_type == 'even-q':
-        cube_center = evenq_to_cube(center)
-        return [cube_to_evenq(hex) for hex in cube_ring(cube_center, radius)]
-    else:
-        raise ValueError("Invalid offset type")
+    to_cube, from_cube = _offset_converters(offset_type)
+    return [from_cube(hex) for hex in cube_ring(to_cube(center), radius)]
 
 def offset_spiral(center: OffsetHex, radius: int, offset_type: str = 'odd-r') -> List[OffsetHex]:
     """Get all hexes in a spiral around the center up to the given radius (offset)."""
-    if offset_type == 'odd-r':
-        cube_center = oddr_to_cube(center)
-        return [cube_to_oddr(hex) for hex in cube_spiral(cube_center, radius)]
-    elif offset_type == 'even-r':
-        cube_center = evenr_to_cube(center)
-        return [cube_to_evenr(hex) for hex in cube_spiral(cube_center, radius)]
-    elif offset_type == 'odd-q':
-        cube_center = oddq_to_cube(center)
-        return [cube_to_oddq(hex) for hex in cube_spiral(cube_center, radius)]
-    elif offset_type == 'even-q':
-        cube_center = evenq_to_cube(center)
-        return [cube_to_evenq(hex) for hex in cube_spiral(cube_center, radius)]
-    else:
-        raise ValueError("Invalid offset type")
+    to_cube, from_cube = _offset_converters(offset_type)
+    return [from_cube(hex) for hex in cube_spiral(to_cube(center), radius)]
 
 # =============
 # Line Drawing
@@ -321,19 +411,55 @@ def cube_lerp(a: CubeHex, b: CubeHex, t: float) -> CubeHex:
         round(a[2] + (b[2] - a[2]) * t)
     )
 
-def cube_line(a: CubeHex, b: CubeHex) -> List[CubeHex]:
-    """Draw a line between two cube hexes."""
-    N = cube_distance(a, b)
-    a_nudge = (a[0] + 1e-6, a[1] + 1e-6, a[2] - 2e-6)
-    b_nudge = (b[0] + 1e-6, b[1] + 1e-6, b[2] - 2e-6)
+# Fixed-point scale for cube_line; the (+1, +1, -2) / _LINE_SCALE nudge is the
+# usual epsilon that keeps points on hex edges rounding consistently
+_LINE_SCALE = 1000000
+
+def _cube_line_walk(aq, ar, as_, bq, br, bs):
+    """Fixed-point line walk behind cube_line, on hex components; also compiled as cube_line_nb."""
+    N = max(abs(aq - bq), abs(ar - br), abs(as_ - bs))
+    if N == 0:
+        return [(aq, ar, as_)]
+    
+    # Walk the lerp in integers scaled by N * _LINE_SCALE, so each step is an
+    # exact add and rounding needs no floats
+    scale = N * _LINE_SCALE
+    half = scale // 2
+    q_acc = aq * scale + N
+    r_acc = ar * scale + N
+    s_acc = as_ * scale - 2 * N
+    q_step = (bq - aq) * _LINE_SCALE
+    r_step = (br - ar) * _LINE_SCALE
+    s_step = (bs - as_) * _LINE_SCALE
     results = []
     
     for i in range(N + 1):
-        t = 1.0 / N * i
-        results.append(cube_round(cube_lerp(a_nudge, b_nudge, t)))
+        q = (q_acc + half) // scale
+        r = (r_acc + half) // scale
+        s = (s_acc + half) // scale
+        
+        q_diff = abs(q * scale - q_acc)
+        r_diff = abs(r * scale - r_acc)
+        s_diff = abs(s * scale - s_acc)
+        
+        if q_diff > r_diff and q_diff > s_diff:
+            q = -r - s
+        elif r_diff > s_diff:
+            r = -q - s
+        else:
+            s = -q - r
+        results.append((q, r, s))
+        
+        q_acc += q_step
+        r_acc += r_step
+        s_acc += s_step
     
     return results
 
+def cube_line(a: CubeHex, b: CubeHex) -> List[CubeHex]:
+    """Draw a line between two cube hexes."""
+    return cube_line_nb(a[0], a[1], a[2], b[0], b[1], b[2])
+
 def cube_round(frac: CubeHex) -> CubeHex:
     """Round fractional cube coordinates to the nearest whole hex."""
     q = round(frac[0])
@@ -353,6 +479,23 @@ def cube_round(frac: CubeHex) -> CubeHex:
     
     return (q, r, s)
 
+def cube_round_batch(frac: np.ndarray) -> np.ndarray:
+    """Round an (N, 3) array of fractional cube coordinates to whole hexes."""
+    rounded = np.round(frac)
+    diff = np.abs(rounded - frac)
+    
+    # Branch-free masks with cube_round's tie order: q only when its error is
+    # strictly largest, then r over s. Faster here than an argmax gather.
+    fix_q = (diff[:, 0] > diff[:, 1]) & (diff[:, 0] > diff[:, 2])
+    fix_r = ~fix_q & (diff[:, 1] > diff[:, 2])
+    fix_s = ~(fix_q | fix_r)
+    
+    q, r, s = rounded[:, 0], rounded[:, 1], rounded[:, 2]
+    rounded[:, 0] = np.where(fix_q, -r - s, q)
+    rounded[:, 1] = np.where(fix_r, -q - s, r)
+    rounded[:, 2] = np.where(fix_s, -q - r, s)
+    return rounded.astype(int)
+
 def axial_line(a: AxialHex, b: AxialHex) -> List[AxialHex]:
     """Draw a line between two axial hexes."""
     ac = axial_to_cube(a)
@@ -362,53 +505,113 @@ def axial_line(a: AxialHex, b: AxialHex) -> List[AxialHex]:
 
 def offset_line(a: OffsetHex, b: OffsetHex, offset_type: str = 'odd-r') -> List[OffsetHex]:
     """Draw a line between two offset hexes."""
-    if offset_type == 'odd-r':
-        ac = oddr_to_cube(a)
-        bc = oddr_to_cube(b)
-        line = cube_line(ac, bc)
-        return [cube_to_oddr(hex) for hex in line]
-    elif offset_type == 'even-r':
-        ac = evenr_to_cube(a)
-        bc = evenr_to_cube(b)
-        line = cube_line(ac, bc)
-        return [cube_to_evenr(hex) for hex in line]
-    elif offset_type == 'odd-q':
-        ac = oddq_to_cube(a)
-        bc = oddq_to_cube(b)
-        line = cube_line(ac, bc)
-        return [cube_to_oddq(hex) for hex in line]
-    elif offset_type == 'even-q':
-        ac = evenq_to_cube(a)
-        bc = evenq_to_cube(b)
-        line = cube_line(ac, bc)
-        return [cube_to_evenq(hex) for hex in line]
+    to_cube, from_cube = _offset_converters(offset_type)
+    line = cube_line(to_cube(a), to_cube(b))
+    return [from_cube(hex) for hex in line]
+
+# ===========
+# JIT Kernels
+# ===========
+
+# Scalar versions of the hot integer routines, compiled with Numba when it is
+# installed. Hexes are passed as separate q, r, s ints.
+
+@njit
+def cube_distance_nb(aq, ar, as_, bq, br, bs):
+    """Calculate the distance between two cube hexes given as components."""
+    dq = aq - bq
+    dr = ar - br
+    return max(abs(dq), abs(dr), abs(dq + dr))
+
+@njit
+def cube_neighbor_nb(q, r, s, direction):
+    """Get the neighbor of a cube hex (as components) in the specified direction (0-5)."""
+    direction = direction % 6
+    return (q + CUBE_DIRS_Q[direction], r + CUBE_DIRS_R[direction], s + CUBE_DIRS_S[direction])
+
+@njit
+def cube_round_nb(fq, fr, fs):
+    """Round fractional cube components to the nearest whole hex."""
+    q = round(fq)
+    r = round(fr)
+    s = round(fs)
+    
+    q_diff = abs(q - fq)
+    r_diff = abs(r - fr)
+    s_diff = abs(s - fs)
+    
+    if q_diff > r_diff and q_diff > s_diff:
+        q = -r - s
+    elif r_diff > s_diff:
+        r = -q - s
     else:
-        raise ValueError("Invalid offset type")
+        s = -q - r
+    
+    return (int(q), int(r), int(s))
+
+# Compiled from the walk cube_line uses rather than a copy of it, so the
+# Python and Numba paths share one body
+cube_line_nb = njit(_cube_line_walk)
 
 # =================
 # Field of View
 # =================
 
+def _merge_shadows(shadows: List[Tuple[float, float]],
+                   new_shadows: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Merge shadow intervals into a sorted list of disjoint intervals."""
+    merged = []
+    for start, end in sorted(shadows + new_shadows):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
 def cube_visible(center: CubeHex, radius: int, obstacles: Set[CubeHex]) -> Set[CubeHex]:
     """Calculate field of view from center hex within given radius, avoiding obstacles."""
     visible = set()
     visible.add(center)
+    if center in obstacles:
+        return visible
     
+    # Shadowcasting: positions around a ring map to [0, 6), one unit per
+    # sextant, and a hex at index p of ring d spans (p -/+ 0.5) / d. Obstacles
+    # cast their span outwards; a hex is hidden if its center lies in a shadow.
+    # The sweep runs on packed keys and unpacks the visible hexes at the end.
+    packed_obstacles = _pack_hexes(obstacles)
+    center_key = pack(center[0], center[1])
+    visible_keys = []
+    shadows = []
     for ring_radius in range(1, radius + 1):
-        ring = cube_ring(center, ring_radius)
-        for hex in ring:
-            line = cube_line(center, hex)
-            blocked = False
-            for h in line:
-                if h in obstacles:
-                    blocked = True
-                    break
-                if cube_distance(center, h) > radius:
-                    blocked = True
-                    break
-            if not blocked:
-                visible.add(hex)
+        starts = [start for start, _ in shadows]
+        new_shadows = []
+        
+        for p, offset in enumerate(_packed_ring_offsets(ring_radius)):
+            key = center_key + offset
+            if key in packed_obstacles:
+                low = (2 * p - 1) / (2 * ring_radius)
+                high = (2 * p + 1) / (2 * ring_radius)
+                if p == 0:
+                    # The first hex straddles the wrap-around at 0 / 6
+                    new_shadows.append((-1.0, high))
+                    new_shadows.append((6 + low, 7.0))
+                else:
+                    new_shadows.append((low, high))
+                continue
+            
+            position = p / ring_radius
+            i = bisect.bisect_right(starts, position) - 1
+            if i < 0 or not (shadows[i][0] < position < shadows[i][1]):
+                visible_keys.append(key)
+        
+        if new_shadows:
+            shadows = _merge_shadows(shadows, new_shadows)
+            if shadows[0][0] <= 0 and shadows[0][1] >= 6:
+                break
     
+    visible.update(map(unpack, visible_keys))
     return visible
 
 def axial_visible(center: AxialHex, radius: int, obstacles: Set[AxialHex]) -> Set[AxialHex]:
@@ -418,31 +621,16 @@ def axial_visible(center: AxialHex, radius: int, obstacles: Set[AxialHex]) -> Se
     visible_cubes = cube_visible(cube_center, radius, cube_obstacles)
     return {cube_to_axial(hex) for hex in visible_cubes}
 
-def offset_visible(center: OffsetHex, radius: int, obstacles: Set[OffsetHex], 
+def offset_visible(center: OffsetHex, radius: int, obstacles: Union[Set[OffsetHex], np.ndarray], 
                   offset_type: str = 'odd-r') -> Set[OffsetHex]:
-    """Calculate field of view from center hex within given radius (offset), avoiding obstacles."""
-    if offset_type == 'odd-r':
-        cube_center = oddr_to_cube(center)
-        cube_obstacles = {oddr_to_cube(hex) for hex in obstacles}
-        visible_cubes = cube_visible(cube_center, radius, cube_obstacles)
-        return {cube_to_oddr(hex) for hex in visible_cubes}
-    elif offset_type == 'even-r':
-        cube_center = evenr_to_cube(center)
-        cube_obstacles = {evenr_to_cube(hex) for hex in obstacles}
-        visible_cubes = cube_visible(cube_center, radius, cube_obstacles)
-        return {cube_to_evenr(hex) for hex in visible_cubes}
-    elif offset_type == 'odd-q':
-        cube_center = oddq_to_cube(center)
-        cube_obstacles = {oddq_to_cube(hex) for hex in obstacles}
-        visible_cubes = cube_visible(cube_center, radius, cube_obstacles)
-        return {cube_to_oddq(hex) for hex in visible_cubes}
-    elif offset_type == 'even-q':
-        cube_center = evenq_to_cube(center)
-        cube_obstacles = {evenq_to_cube(hex) for hex in obstacles}
-        visible_cubes = cube_visible(cube_center, radius, cube_obstacles)
-        return {cube_to_evenq(hex) for hex in visible_cubes}
-    else:
-        raise ValueError("Invalid offset type")
+    """Calculate field of view from center hex within given radius (offset), avoiding obstacles.
+    
+    Obstacles may be a set of offset tuples or a (K, 2) integer array.
+    """
+    to_cube, from_cube = _offset_converters(offset_type)
+    cube_obstacles = _cube_obstacles(obstacles, offset_type)
+    visible_cubes = cube_visible(to_cube(center), radius, cube_obstacles)
+    return {from_cube(hex) for hex in visible_cubes}
 
 # =============
 # Pathfinding
@@ -450,62 +638,86 @@ def offset_visible(center: OffsetHex, radius: int, obstacles: Set[OffsetHex],
 
 def cube_bfs(start: CubeHex, goals: Set[CubeHex], obstacles: Set[CubeHex], max_distance: int = None) -> Dict[CubeHex, int]:
     """Breadth-first search on a hex grid, returning distances to goal hexes."""
-    frontier = deque()
-    frontier.append(start)
-    came_from = {}
+    # The search runs on packed keys, unpacked only for the result. The
+    # frontier is a plain list consumed from an index; every hex is appended
+    # once, so it never needs to shrink
+    packed_obstacles = _pack_hexes(obstacles)
+    packed_goals = _pack_hexes(goals)
+    start_key = pack(start[0], start[1])
+    frontier = [start_key]
+    head = 0
     distance = {}
-    came_from[start] = None
-    distance[start] = 0
+    distance[start_key] = 0
     found_goals = set()
     
-    while frontier:
-        current = frontier.popleft()
+    while head < len(frontier):
+        current = frontier[head]
+        head += 1
         
-        if current in goals:
+        if current in packed_goals:
             found_goals.add(current)
-            if len(found_goals) == len(goals):
+            if len(found_goals) == len(packed_goals):
                 break
         
-        for neighbor in cube_neighbors(current):
-            if neighbor in obstacles:
-                continue
-            if neighbor not in distance:
-                if max_distance is not None and distance[current] >= max_distance:
-                    continue
+        cur_dist = distance[current]
+        if max_distance is not None and cur_dist >= max_distance:
+            continue
+        
+        next_dist = cur_dist + 1
+        for d in _PACKED_DIRECTIONS:
+            neighbor = current + d
+            if neighbor not in distance and neighbor not in packed_obstacles:
+                distance[neighbor] = next_dist
                 frontier.append(neighbor)
-                came_from[neighbor] = current
-                distance[neighbor] = distance[current] + 1
     
-    return distance
+    return {unpack(key): dist for key, dist in distance.items()}
 
 def cube_path(start: CubeHex, goal: CubeHex, obstacles: Set[CubeHex]) -> List[CubeHex]:
-    """Find the shortest path between two hexes, avoiding obstacles."""
-    frontier = deque()
-    frontier.append(start)
+    """Find the shortest path between two hexes, avoiding obstacles (A*)."""
+    # Runs on packed keys. Entries are (estimated total cost, cost so far,
+    # key); cube_distance never overestimates, so the first time the goal is
+    # popped its path is shortest
+    packed_obstacles = _pack_hexes(obstacles)
+    start_key = pack(start[0], start[1])
+    goal_key = pack(goal[0], goal[1])
+    # The bias cancels in differences, so the heuristic reads the raw halves
+    goal_hi = goal_key >> 32
+    goal_lo = goal_key & _PACK_MASK
+    frontier = [(cube_distance(start, goal), 0, start_key)]
     came_from = {}
-    came_from[start] = None
+    cost_so_far = {}
+    came_from[start_key] = None
+    cost_so_far[start_key] = 0
     
     while frontier:
-        current = frontier.popleft()
+        _, cost, current = heapq.heappop(frontier)
         
-        if current == goal:
+        if current == goal_key:
             break
+        if cost > cost_so_far[current]:
+            continue
         
-        for neighbor in cube_neighbors(current):
-            if neighbor in obstacles:
+        new_cost = cost + 1
+        for d in _PACKED_DIRECTIONS:
+            neighbor = current + d
+            if neighbor in packed_obstacles:
                 continue
-            if neighbor not in came_from:
-                frontier.append(neighbor)
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
                 came_from[neighbor] = current
+                dq = (neighbor >> 32) - goal_hi
+                dr = (neighbor & _PACK_MASK) - goal_lo
+                priority = new_cost + max(abs(dq), abs(dr), abs(dq + dr))
+                heapq.heappush(frontier, (priority, new_cost, neighbor))
     
-    if goal not in came_from:
+    if goal_key not in came_from:
         return None
     
     # Reconstruct path
-    current = goal
+    current = goal_key
     path = []
-    while current != start:
-        path.append(current)
+    while current != start_key:
+        path.append(unpack(current))
         current = came_from[current]
     path.append(start)
     path.reverse()
@@ -521,40 +733,76 @@ def axial_path(start: AxialHex, goal: AxialHex, obstacles: Set[AxialHex]) -> Lis
         return None
     return [cube_to_axial(hex) for hex in cube_path_result]
 
-def offset_path(start: OffsetHex, goal: OffsetHex, obstacles: Set[OffsetHex], 
+def offset_path(start: OffsetHex, goal: OffsetHex, obstacles: Union[Set[OffsetHex], np.ndarray], 
                offset_type: str = 'odd-r') -> List[OffsetHex]:
-    """Find the shortest path between two offset hexes, avoiding obstacles."""
-    if offset_type == 'odd-r':
-        cube_start = oddr_to_cube(start)
-        cube_goal = oddr_to_cube(goal)
-        cube_obstacles = {oddr_to_cube(hex) for hex in obstacles}
-    elif offset_type == 'even-r':
-        cube_start = evenr_to_cube(start)
-        cube_goal = evenr_to_cube(goal)
-        cube_obstacles = {evenr_to_cube(hex) for hex in obstacles}
-    elif offset_type == 'odd-q':
-        cube_start = oddq_to_cube(start)
-        cube_goal = oddq_to_cube(goal)
-        cube_obstacles = {oddq_to_cube(hex) for hex in obstacles}
-    elif offset_type == 'even-q':
-        cube_start = evenq_to_cube(start)
-        cube_goal = evenq_to_cube(goal)
-        cube_obstacles = {evenq_to_cube(hex) for hex in obstacles}
-    else:
-        raise ValueError("Invalid offset type")
+    """Find the shortest path between two offset hexes, avoiding obstacles.
     
-    cube_path_result = cube_path(cube_start, cube_goal, cube_obstacles)
+    Obstacles may be a set of offset tuples or a (K, 2) integer array.
+    """
+    to_cube, from_cube = _offset_converters(offset_type)
+    cube_obstacles = _cube_obstacles(obstacles, offset_type)
+    cube_path_result = cube_path(to_cube(start), to_cube(goal), cube_obstacles)
     if cube_path_result is None:
         return None
+    return [from_cube(hex) for hex in cube_path_result]
+
+# ============
+# Grid Storage
+# ============
+
+class HexGrid:
+    """A set of cube hexes stored as parallel int32 q, r, s arrays."""
+    
+    def __init__(self, q, r):
+        self.q = np.asarray(q, dtype=np.int32)
+        self.r = np.asarray(r, dtype=np.int32)
+        self.s = -self.q - self.r
+        self._index = None
+    
+    @classmethod
+    def from_hexes(cls, hexes) -> 'HexGrid':
+        """Build a grid from an iterable of cube hex tuples."""
+        coords = np.array(list(hexes), dtype=np.int32).reshape(-1, 3)
+        return cls(coords[:, 0], coords[:, 1])
+    
+    def __len__(self):
+        return len(self.q)
+    
+    def __iter__(self):
+        return zip(self.q.tolist(), self.r.tolist(), self.s.tolist())
+    
+    def __contains__(self, hex):
+        return (hex[0], hex[1]) in self.index
     
-    if offset_type == 'odd-r':
-        return [cube_to_oddr(hex) for hex in cube_path_result]
-    elif offset_type == 'even-r':
-        return [cube_to_evenr(hex) for hex in cube_path_result]
-    elif offset_type == 'odd-q':
-        return [cube_to_oddq(hex) for hex in cube_path_result]
-    elif offset_type == 'even-q':
-        return [cube_to_evenq(hex) for hex in cube_path_result]
+    @property
+    def index(self) -> Dict[AxialHex, int]:
+        """Map of (q, r) to row in the coordinate arrays, built on first use."""
+        if self._index is None:
+            self._index = {qr: i for i, qr in enumerate(zip(self.q.tolist(), self.r.tolist()))}
+        return self._index
+    
+    def to_set(self) -> Set[CubeHex]:
+        """Get the grid as a set of cube hex tuples."""
+        return set(self)
+    
+    def neighbors(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the q, r, s arrays (N, 6) of every hex's six neighbors."""
+        return (self.q[:, None] + CUBE_DIRS_Q[None, :],
+                self.r[:, None] + CUBE_DIRS_R[None, :],
+                self.s[:, None] + CUBE_DIRS_S[None, :])
+    
+    def neighbor_rows(self) -> np.ndarray:
+        """Get the (N, 6) rows of every hex's neighbors, -1 where outside the grid."""
+        nq, nr, _ = self.neighbors()
+        index = self.index
+        rows = [index.get(qr, -1) for qr in zip(nq.ravel().tolist(), nr.ravel().tolist())]
+        return np.array(rows, dtype=np.int32).reshape(nq.shape)
+    
+    def distance(self, hex: CubeHex) -> np.ndarray:
+        """Get the distance from every hex in the grid to the given hex."""
+        dq = self.q - hex[0]
+        dr = self.r - hex[1]
+        return np.maximum(np.maximum(np.abs(dq), np.abs(dr)), np.abs(dq + dr))
 
 # ================
 # Map Generation
@@ -564,6 +812,13 @@ def generate_hex_map(radius: int, center: CubeHex = (0, 0, 0)) -> Set[CubeHex]:
     """Generate a hexagonal map with the given radius around the center."""
     return set(cube_spiral(center, radius))
 
+def generate_hex_grid(radius: int, center: CubeHex = (0, 0, 0)) -> HexGrid:
+    """Generate a hexagonal map with the given radius around the center as a HexGrid."""
+    span = np.arange(-radius, radius + 1, dtype=np.int32)
+    q, r = np.meshgrid(span, span, indexing='ij')
+    inside = np.abs(q + r) <= radius
+    return HexGrid(q[inside] + center[0], r[inside] + center[1])
+
 def generate_rectangular_map(width: int, height: int, offset_type: str = 'odd-r') -> Set[OffsetHex]:
     """Generate a rectangular map with the given width and height."""
     hexes = set()
@@ -615,4 +870,44 @@ def polygon_corners(hex: CubeHex, size: float, layout: str = 'pointy') -> List[T
     for i in range(6):
         offset = hex_corner_offset(i, size, layout)
         corners.append((center[0] + offset[0], center[1] + offset[1]))
-    return corners
\ No newline at end of file
+    return corners
+
+# Unit corner offsets per layout, shape (6, 2)
+HEX_CORNER_OFFSETS = {
+    layout: np.array([hex_corner_offset(i, 1.0, layout) for i in range(6)])
+    for layout in ('pointy', 'flat')
+}
+
+def hex_to_pixel_batch(hexes: np.ndarray, size: float, layout: str = 'pointy') -> np.ndarray:
+    """Convert an (N, 3) array of cube hexes to an (N, 2) array of pixel coordinates."""
+    if layout == 'pointy':
+        orientation = LAYOUT_POINTY
+    else:
+        orientation = LAYOUT_FLAT
+    
+    forward = np.array([
+        [orientation['f0'], orientation['f1']],
+        [orientation['f2'], orientation['f3']]
+    ])
+    return (np.asarray(hexes)[:, :2] @ forward.T) * size
+
+def pixel_to_hex_batch(points: np.ndarray, size: float, layout: str = 'pointy') -> np.ndarray:
+    """Convert an (N, 2) array of pixel coordinates to an (N, 3) array of cube hexes."""
+    if layout == 'pointy':
+        orientation = LAYOUT_POINTY
+    else:
+        orientation = LAYOUT_FLAT
+    
+    backward = np.array([
+        [orientation['b0'], orientation['b1']],
+        [orientation['b2'], orientation['b3']]
+    ])
+    qr = (np.asarray(points, dtype=float) / size) @ backward.T
+    frac = np.column_stack((qr, -qr[:, 0] - qr[:, 1]))
+    return cube_round_batch(frac)
+
+def polygon_corners_batch(hexes: np.ndarray, size: float, layout: str = 'pointy') -> np.ndarray:
+    """Get the corner points of an (N, 3) array of hexes as an (N, 6, 2) pixel array."""
+    corners = HEX_CORNER_OFFSETS['pointy' if layout == 'pointy' else 'flat'] * size
+    centers = hex_to_pixel_batch(hexes, size, layout)
+    return centers[:, None, :] + corners[None, :, :]
\ No newline at end of file
@@ -1,47 +1,49 @@
 import math
 import io
 import random
+from dataclasses import dataclass
+import numpy as np
 file_path = r'C:\Users\Reference\Desktop\svgout_main.svg'
 
 
 def shift(key, array):
     return array[-key:]+array[:-key]
 
-def create_svg_polyline(array):
-    points_str = ' '.join(f"{x},{y}" for x, y in array)
+def number_format(precision=None, count=1, sep=','):
+    # Bound str.format for `count` numbers, shortest round-trip repr by default
+    field = '{}' if precision is None else f'{{:.{precision}f}}'
+    return sep.join([field] * count).format
+
+def format_points(array, precision=None):
+    # One "x,y" string per point, formatted in a single pass
+    if isinstance(array, np.ndarray):
+        array = array.tolist()
+    fmt = number_format(precision, 2)
+    return [fmt(x, y) for x, y in array]
+
+def create_svg_polyline(array, precision=None):
+    points_str = ' '.join(format_points(array, precision))
     return f'<polyline points="{points_str}" fill="purple" stroke="white" opacity="0.5" stroke-width="1"/>'
 
-def create_svg_line_path(array):
-    outputstring = '<path d="'
-    for index,a in enumerate(array):
-        if index == 0:
-            outputstring+=f'M{a[0]},{a[1]} '
-            continue
-        else:
-            outputstring+=f'L{a[0]},{a[1]} '
-    outputstring+=f'L{array[0][0]},{array[0][1]} '
-    outputstring+='Z" style="fill:none;stroke:red;stroke-width:1.86px;"/>'
-    return outputstring
+def create_svg_line_path(array, precision=None):
+    points = format_points(array, precision)
+    points.append(points[0])
+    return '<path d="M' + ' L'.join(points) + ' Z" style="fill:none;stroke:red;stroke-width:1.86px;"/>'
 
-def create_svg_line_path2(array, centerx, centery,a1,a2):
+def create_svg_line_path2(array, centerx, centery,a1,a2, precision=None):
     distance = 0.0001
     dx = distance*math.cos(a1) 
     dy = distance*math.sin(a1) 
-    dx2 = distance*math.cos(a2)
-    dy2 = distance*math.sin(a2)
 
-    outputstring = '<path d="'
-    for index,a in enumerate(array):
-        if index == 0:
-            outputstring+=f'M{a[0]},{a[1]} '
-        else:
-            outputstring+=f'L{a[0]},{a[1]} '
-    outputstring+=f'Q{centerx+dx} {centery+dy} {array[0][0]} {array[0][1]} '     
-    outputstring+=f'L{array[0][0]},{array[0][1]} '
-    outputstring+='Z" style="fill:none;stroke:red;stroke-width:1px;"/>'
-    return outputstring
+    if isinstance(array, np.ndarray):
+        array = array.tolist()
+    points = format_points(array, precision)
+    spaced = number_format(precision, 2, ' ')
+    return ('<path d="M' + ' L'.join(points) +
+            f' Q{spaced(centerx+dx, centery+dy)} {spaced(*array[0])} L{points[0]} ' +
+            'Z" style="fill:none;stroke:red;stroke-width:1px;"/>')
 
-def create_svg_arc_path(center_x, center_y, inner_radius, outer_radius, start_angle, end_angle):
+def create_svg_arc_path(center_x, center_y, inner_radius, outer_radius, start_angle, end_angle, precision=None):
     start_rad = math.radians(start_angle)
     end_rad = math.radians(end_angle)
     large_arc_flag = 1 if end_rad - start_rad > math.pi else 0
@@ -56,21 +58,21 @@ def create_svg_arc_path(center_x, center_y, inner_radius, outer_radius, start_an
     x4 = center_x + inner_radius * math.cos(start_rad)
     y4 = center_y + inner_radius * math.sin(start_rad)
     
+    pair = number_format(precision, 2)
     path = (
-        f"M{x1},{y1} " +
-        f"A{outer_radius},{outer_radius} 0 {large_arc_flag} 1 {x2},{y2} " +
-        f"L{x3},{y3} " +
-        f"A{inner_radius},{inner_radius} 0 {large_arc_flag} 0 {x4},{y4} " +
+        f"M{pair(x1, y1)} " +
+        f"A{pair(outer_radius, outer_radius)} 0 {large_arc_flag} 1 {pair(x2, y2)} " +
+        f"L{pair(x3, y3)} " +
+        f"A{pair(inner_radius, inner_radius)} 0 {large_arc_flag} 0 {pair(x4, y4)} " +
         "Z"
     )
     return path
 
-def shift_and_find_zero_groups(occupancy):
-    occupancy.pop(0)
+def find_zero_groups(occupancy):
     try:
         first_one_index = occupancy.index(1)
     except:
-        return []  # Return empty list when no zeros
+        return ()  # Return no groups when there is no 1 to start from
     
     shifted_occupancy = occupancy[first_one_index:] + occupancy[:first_one_index]
     zero_groups = []
@@ -81,13 +83,53 @@ def shift_and_find_zero_groups(occupancy):
             current_group.append((i+first_one_index)%len(occupancy))
         else:
             if current_group:
-                zero_groups.append(current_group)
+                zero_groups.append(tuple(current_group))
                 current_group = []
     
     if current_group:
-        zero_groups.append(current_group)
+        zero_groups.append(tuple(current_group))
     
-    return zero_groups
+    return tuple(zero_groups)
+
+# Zero groups for every 12-slot outer occupancy, indexed by its bitmask
+# (bit i set when slot i is occupied)
+_ZERO_GROUPS_LUT = [find_zero_groups([(bits >> i) & 1 for i in range(12)]) for bits in range(1 << 12)]
+
+def shift_and_find_zero_groups(occupancy):
+    # Ignores the center slot (index 0) and groups the zeros of the outer slots
+    if len(occupancy) != 13:
+        return find_zero_groups(list(occupancy[1:]))
+    bits = 0
+    for i, v in enumerate(occupancy[1:]):
+        bits |= int(v) << i
+    return _ZERO_GROUPS_LUT[bits]
+
+# Gap arcs per occupancy pattern, as (point indices, angle indices). Point
+# indices 0-11 address the path vertices and 12-17 the main vertices.
+_GAP_PATHS_CACHE = {}
+
+def gap_path_indices(occupancy):
+    # Plain ints, so NumPy rows (e.g. the uint8 ones from
+    # binary_patterns_to_hextile_occupancies) share cache entries with lists
+    key = tuple(map(int, occupancy))
+    if key in _GAP_PATHS_CACHE:
+        return _GAP_PATHS_CACHE[key]
+
+    paths = []
+    for gap in shift_and_find_zero_groups(key):
+        if not gap:
+            continue
+        beginning = gap[0]
+        ending = gap[-1]
+        # The arc runs from the path vertex before the first gap, through the
+        # corners inside the gap, to the path vertex closing the last gap
+        points = [(beginning - 1) % 12]
+        points.extend(12 + p // 2 for p in gap if p % 2 == 0)
+        points.append(ending)
+        paths.append((tuple(points), ((ending - 1) % 12, ending)))
+
+    _GAP_PATHS_CACHE[key] = paths
+    return paths
 
 def drawline(x, y, x2, y2, stroke_color='red', stroke_width=2):
     return f'<line x1="{x}" y1="{y}" x2="{x2}" y2="{y2}" stroke="{stroke_color}" stroke-width="{stroke_width}" />'
@@ -98,52 +140,93 @@ def makelabel(label, x,y):
 def makelabel2(label, x,y,color):
     return f'<text x="{x}" y="{y}" fill="{color}" font-weight="light" font-size="4px" font-family="Roboto">{label}</text>'
 
+# Unit directions to the hexagon corners and to the adjacent hexagon centers
+_CORNER_ANGLES = np.deg2rad(np.arange(6) * 60 - 30)
+_CORNER_COS = np.cos(_CORNER_ANGLES)
+_CORNER_SIN = np.sin(_CORNER_ANGLES)
+_OUTER_ANGLES = np.deg2rad(np.arange(6) * 60)
+_OUTER_COS = np.cos(_OUTER_ANGLES)
+_OUTER_SIN = np.sin(_OUTER_ANGLES)
+
+# Tile geometry around (0, 0), keyed by (side_length, path_width)
+_TILE_TEMPLATE_CACHE = {}
+
+def tile_template(side_length, path_width):
+    key = (side_length, path_width)
+    if key in _TILE_TEMPLATE_CACHE:
+        return _TILE_TEMPLATE_CACHE[key]
+
+    # Main vertices
+    mainverts = np.column_stack((side_length * _CORNER_COS, side_length * _CORNER_SIN))
+
+    # Centers of adjacent hexagons
+    outer_radius = side_length * 0.8660 * 2
+    outerverts = np.column_stack((outer_radius * _OUTER_COS, outer_radius * _OUTER_SIN))
+
+    # Path points (subvertices), two per edge around its midpoint
+    nextverts = np.roll(mainverts, -1, axis=0)
+    mids = (mainverts + nextverts) / 2
+    inward = np.arctan2(-mids[:, 1], -mids[:, 0])
+    angles = np.repeat(inward, 2)
+
+    delta = nextverts - mainverts
+    edge_angles = np.arctan2(delta[:, 1], delta[:, 0])
+    offset = path_width / 2
+    along = np.column_stack((np.cos(edge_angles), np.sin(edge_angles))) * offset
+    pathverts = np.stack((mids - along, mids + along), axis=1).reshape(12, 2)
+
+    template = (mainverts, outerverts, pathverts, angles.tolist())
+    _TILE_TEMPLATE_CACHE[key] = template
+    return template
+
+@dataclass(slots=True, frozen=True)
 class Vertex:
-    def __init__(self, x=-1, y=-1, z=-1):
-        self.x = x
-        self.y = y
-        self.z = z
+    x: float = -1
+    y: float = -1
+    z: float = -1
 
+@dataclass(slots=True, frozen=True)
 class Edge:
-    def __init__(self, v1=None, v2=None):
-        self.v1 = v1
-        self.v2 = v2
+    v1: Vertex = None
+    v2: Vertex = None
     
     def co(self):
         return (self.v1, self.v2)
 
 class HexTile:
-    def __init__(self, cx=0, cy=0, side_length=36, path_width=3):
+    def __init__(self, cx=0, cy=0, side_length=36, path_width=3, precision=None):
         self.cx = cx
         self.cy = cy
         self.center = (cx, cy)
         self.path_width = path_width
         self.radius = side_length
         self.verts = []
-        self.mainverts = []
-        self.outerverts = []
-        self.pathverts = []
+        self.mainverts = np.zeros((6, 2))
+        self.outerverts = np.zeros((6, 2))
+        self.pathverts = np.zeros((12, 2))
         self.angles = []
         self.lines = []
         self.occupancy = [0,1,1,1,1,0,0,1,0,0,0,0,0]
         self.side_length = side_length
         self.labels = []
+        self.precision = precision
 
     def getvert(self, v):
+        # Corners index the path vertices rotated by one, i.e. shift(1, self.pathverts)
+        n = len(self.pathverts)
         if v%2 == 1:  # ODD (EDGE)
-            v = (v-1)/2
-            return (self.pathverts[int(v*2)], self.pathverts[int(v*2+1)])
+            return self.pathverts[v-1:v+1]
         else:  # EVEN (CORNER)
-            v = v/2
-            return (shift(1, self.pathverts)[int(v*2)], shift(1, self.pathverts)[int(v*2+1)])
+            return self.pathverts[[(v-1) % n, v % n]]
 
     def getvpair(self, v):
         vertex = int(v/2)
         if v%2 == 0:
-            a = shift(1, self.pathverts)[vertex*2]
-            b = shift(1, self.pathverts)[vertex*2+1]
-            a1 = shift(1, self.angles)[vertex*2]
-            a2 = shift(1, self.angles)[vertex*2+1]
+            n = len(self.pathverts)
+            a = self.pathverts[(vertex*2-1) % n]
+            b = self.pathverts[(vertex*2) % n]
+            a1 = self.angles[(vertex*2-1) % n]
+            a2 = self.angles[(vertex*2) % n]
             return ([a,b], [a1,a2])
         else:
             a = self.pathverts[vertex*2]
@@ -152,97 +235,65 @@ class HexTile:
             a2 = self.angles[vertex*2+1]
             return [[a,b], [a1,a2]]
 
+    def placeverts(self):
+        mainverts, outerverts, pathverts, angles = tile_template(self.side_length, self.path_width)
+        center = (self.cx, self.cy)
+        np.add(mainverts, center, out=self.mainverts)
+        np.add(outerverts, center, out=self.outerverts)
+        np.add(pathverts, center, out=self.pathverts)
+        self.angles = list(angles)
+
+    def gappaths(self):
+        # Construction points and end angles of the arc around each gap
+        verts = np.vstack((self.pathverts, self.mainverts))
+        paths = []
+        for points, (a1, a2) in gap_path_indices(self.occupancy):
+            construction_points = verts[list(points)]
+            paths.append((construction_points, [self.angles[a1], self.angles[a2]]))
+        return paths
+
     def creategeometry(self):
-        width = self.side_length * 2
-        height = math.sqrt(3) * self.side_length
-
-        # Main vertices
-        for i in range(6):
-            angle = math.pi / 180 * (60 * i - 30)
-            x = self.cx + self.side_length * math.cos(angle)
-            y = self.cy + self.side_length * math.sin(angle)
-            self.mainverts.append((x, y))
-
-        # Centers of adjacent hexagons
-        for i in range(6):
-            angle = math.pi / 180 * (60 * i)
-            x = self.cx + (self.side_length * 0.8660 * 2) * math.cos(angle) 
-            y = self.cy + (self.side_length * 0.8660 * 2) * math.sin(angle) 
-            self.outerverts.append((x, y))
-
-        # Path points (subvertices)
-        for i in range(6):
-            v1 = self.mainverts[i]
-            v2 = self.mainverts[(i + 1) % 6]
-            mid_x = (v1[0] + v2[0]) / 2
-            mid_y = (v1[1] + v2[1]) / 2
-
-            self.angles.append(math.atan2(self.cy-mid_y, self.cx-mid_x))
-            self.angles.append(math.atan2(self.cy-mid_y, self.cx-mid_x))
-
-            dx = v2[0] - v1[0]
-            dy = v2[1] - v1[1]
-            angle = (math.atan2(dy, dx))
-            offset = self.path_width / 2
-            subx1 = mid_x + (math.cos(angle) * offset)
-            subx2 = mid_x - (math.cos(angle) * offset)
-            suby1 = mid_y + (math.sin(angle) * offset)
-            suby2 = mid_y - (math.sin(angle) * offset)
-
-            self.pathverts.append((subx2, suby2))
-            self.pathverts.append((subx1, suby1))
+        self.placeverts()
 
         # Create arcs for gaps
-        gap_groups = shift_and_find_zero_groups(self.occupancy)
-        if gap_groups:
-            for gap in gap_groups:
-                if not gap:
-                    continue
-                    
-                construction_points = []
-                beginning = gap[0]
-                ending = gap[-1]
-
-                coords = self.getvpair(beginning)
-                construction_points.append(coords[0][0])
-                angle1 = coords[1][0]
-
-                coords = self.getvpair(ending)
-                angle = coords[1]
-                coords = coords[0]
-
-                for p in gap:
-                    if p % 2 == 0:
-                        p = int(p/2)
-                        middle = self.mainverts[p]
-                        construction_points.append(middle)
-
-                construction_points.append((coords[1][0], coords[1][1]))
-                self.lines.append(create_svg_line_path2(construction_points, 
-                                      self.center[0], self.center[1], 
-                                      angle[0], angle[1]))
+        for construction_points, angle in self.gappaths():
+            self.lines.append(create_svg_line_path2(construction_points, 
+                                  self.center[0], self.center[1], 
+                                  angle[0], angle[1], self.precision))
 
     def svgexport(self):
-        svg_output = ''
         # Only include paths/lines, no debug shapes
-        for l in self.lines:
-            svg_output += l + "\n"
-        return svg_output
-
-# Generate final SVG
-finalstring = f'<svg width="{3000}" height="{3000}" xmlns="http://www.w3.org/2000/svg" style="background-color: black;">'
-
-for r in range(0, 16):
-    for c in range(0, 16):
-        hex_tile = HexTile(cx=r*100+50, cy=c*100+50)
-        randombits = []
-        for i in range(0, 13):
-            randombits.append(1 if random.random() > 0.5 else 0)
-        hex_tile.occupancy = randombits
-        hex_tile.creategeometry()
-        finalstring += hex_tile.svgexport()
-
-finalstring += '</svg>'
-
-with io.open(file_path, 'w') as file:
-    file.write(finalstring)
\ No newline at end of file
+        return ''.join(l + "\n" for l in self.lines)
+
+def render_tile_grid(centers, occupancies, side_length=36, path_width=3, precision=None):
+    # Tiles only differ by translation and occupancy, so build the gap paths
+    # once per distinct occupancy pattern and translate them to every center
+    centers = np.asarray(centers, dtype=float)
+    mainverts, _, pathverts, angles = tile_template(side_length, path_width)
+    verts = np.vstack((pathverts, mainverts))
+    groups = {}
+    for index, occupancy in enumerate(occupancies):
+        groups.setdefault(tuple(occupancy), []).append(index)
+
+    tile_lines = [[] for _ in range(len(centers))]
+    for pattern, rows in groups.items():
+        group_centers = centers[rows]
+        for points, (a1, a2) in gap_path_indices(pattern):
+            placed = verts[list(points)][None, :, :] + group_centers[:, None, :]
+            for row, tile_points, (cx, cy) in zip(rows, placed.tolist(), group_centers.tolist()):
+                tile_lines[row].append(create_svg_line_path2(tile_points, cx, cy, angles[a1], angles[a2], precision))
+
+    return [''.join(l + "\n" for l in lines) for lines in tile_lines]
+
+if __name__ == "__main__":
+    # Generate final SVG
+    centers = np.array([(r*100+50, c*100+50) for r in range(0, 16) for c in range(0, 16)])
+    occupancies = [[1 if random.random() > 0.5 else 0 for i in range(0, 13)] for _ in range(len(centers))]
+
+    parts = [f'<svg width="{3000}" height="{3000}" xmlns="http://www.w3.org/2000/svg" style="background-color: black;">']
+    parts.extend(render_tile_grid(centers, occupancies))
+    parts.append('</svg>')
+    finalstring = ''.join(parts)
+
+    with io.open(file_path, 'w', buffering=1 << 20) as file:
+        file.write(finalstring)
@@ -1,11 +1,26 @@
+import io
+import itertools
 import math
-import random
+import multiprocessing
+import os
+import numpy as np
 from polygon_utils import Point, Edge, Face, PolygonFramework
-from hextile_utils import HexTile
+from hextile_utils import HexTile, number_format
+
+
+class _CoordStrings(dict):
+    """Float -> SVG string cache; grid coordinates repeat, so each is formatted once."""
+    def __init__(self, precision=None):
+        super().__init__()
+        self._fmt = number_format(precision)
+    
+    def __missing__(self, value):
+        text = self[value] = self._fmt(value)
+        return text
 
 def create_hexagon_grid(radius, rows, cols, file_path, 
                        point_status_bias=0.5, edge_status_bias=0.5,
-                       debug_mode=False):
+                       debug_mode=False, precision=None, processes=1):
     """
     Creates a hexagonal grid with random point/edge statuses and saves as SVG.
     
@@ -17,6 +32,11 @@ def create_hexagon_grid(radius, rows, cols, file_path,
         point_status_bias: Probability (0-1) for points to be active
         edge_status_bias: Probability (0-1) for edges to be active
         debug_mode: Show status colors if True
+        precision: Decimal places for SVG coordinates (None = shortest repr)
+        processes: Worker processes for building hextiles (1 = no pool, None = one per CPU)
+        
+    Returns:
+        PolygonFramework: The merged grid the SVG was drawn from
     """
     framework = PolygonFramework()
     
@@ -24,129 +44,169 @@ def create_hexagon_grid(radius, rows, cols, file_path,
     hex_width = radius * math.sqrt(3)
     hex_height = radius * 1.5
     
+    # Unit hexagon corners, scaled to the radius. Every hexagon shares them,
+    # so the trig runs once for the whole grid rather than per cell
+    angles = math.pi / 180 * (np.arange(6) * 60 - 30)
+    corners = np.stack([np.cos(angles), np.sin(angles)], axis=1) * radius
+    
+    # Hexagon centers, odd rows shifted right by half a hexagon
+    cols_idx, rows_idx = np.meshgrid(np.arange(cols), np.arange(rows))
+    cx = cols_idx * hex_width + (rows_idx % 2) * (hex_width / 2)
+    cy = rows_idx * hex_height
+    centers = np.stack([cx.ravel(), cy.ravel()], axis=1)
+    
+    # All vertex coordinates at once, shape (rows*cols, 6, 2)
+    verts = centers[:, None, :] + corners[None, :, :]
+    
     # Create grid
-    for row in range(rows):
-        for col in range(cols):
-            x_offset = col * hex_width
-            if row % 2 == 1:
-                x_offset += hex_width / 2
-            y_offset = row * hex_height
-            
-            points = []
-            for i in range(6):
-                angle_deg = 60 * i - 30
-                angle_rad = math.pi / 180 * angle_deg
-                x = x_offset + radius * math.cos(angle_rad)
-                y = y_offset + radius * math.sin(angle_rad)
-                points.append(framework.add_point(Point(x, y, 0)))
-
-            edges = []
-            for i in range(6):
-                edges.append(framework.add_edge(points[i], points[(i+1)%6]))
-            
-            framework.add_face(edges)
+    for hex_verts in verts.tolist():
+        points = [framework.add_point(Point(x, y, 0)) for x, y in hex_verts]
+        
+        edges = []
+        for i in range(6):
+            edges.append(framework.add_edge(points[i], points[(i+1)%6]))
+        
+        framework.add_face(edges)
     # Merge points that drifted close during operations
     merged_count = framework.merge_close_points()
     print(f"Merged {merged_count} overlapping points")
     
-    # Set random point statuses
-    for point in framework.points:
-        point.status = random.random() < point_status_bias
+    # Random point and edge statuses, drawn once as arrays and handed to the
+    # SVG writer, which uses them for both the underpainting and the hextile
+    # patterns; the framework is discarded, so they aren't copied onto the objects
+    point_status = np.random.random(len(framework.points)) < point_status_bias
+    edge_status = np.random.random(len(framework.edges)) < edge_status_bias
     
-    # Set random edge statuses
-    for edge in framework.edges:
-        edge.status = random.random() < edge_status_bias
+    # Stream SVG with optional debug visualization straight to the file
+    with open(file_path, 'w', buffering=1 << 20) as f:
+        write_svg(f, framework, radius, debug_mode, precision, processes,
+                  point_status, edge_status)
     
-    # Generate SVG with optional debug visualization
-    svg_content = generate_svg(framework, radius, debug_mode)
+    return framework
+
+def _build_tile_svg(args):
+    """Builds one hextile and returns its SVG; module level so a process pool can pickle it."""
+    cx, cy, edge_length, occupancy, precision = args
     
-    with open(file_path, 'w') as f:
-        f.write(svg_content)
+    # Create tile with proper positioning and sizing
+    tile = HexTile(cx=cx, cy=cy, side_length=edge_length, path_width=edge_length/10,
+                   precision=precision)
+    tile.occupancy = occupancy
+    tile.creategeometry()
+    return tile.svgexport()
 
-def generate_svg(framework, radius, debug_mode):
-    """Generates SVG with optional debug visualization and hextile layer."""
-    min_x = min(p.x for p in framework.points)
-    max_x = max(p.x for p in framework.points)
-    min_y = min(p.y for p in framework.points)
-    max_y = max(p.y for p in framework.points)
+def generate_svg(framework, radius, debug_mode, precision=None, processes=1):
+    """Generates SVG with optional debug visualization and hextile layer, as a string.
+    
+    processes: Worker processes for building hextiles (1 = in this process,
+    None = one per CPU)
+    """
+    buf = io.StringIO()
+    write_svg(buf, framework, radius, debug_mode, precision, processes)
+    return buf.getvalue()
+
+def write_svg(out, framework, radius, debug_mode, precision=None, processes=1,
+              point_status=None, edge_status=None):
+    """Writes the SVG of generate_svg fragment by fragment to the text stream out.
+    
+    point_status, edge_status: Bool arrays in framework row order to use
+    instead of the objects' statuses (default: framework.point_status/edge_status)
+    """
+    if point_status is None:
+        point_status = framework.point_status
+    if edge_status is None:
+        edge_status = framework.edge_status
+    
+    xy = framework.xyz[:, :2]
+    min_x, min_y = xy.min(axis=0).tolist()
+    max_x, max_y = xy.max(axis=0).tolist()
     
     width = max_x - min_x + 20
     height = max_y - min_y + 20
     
-    svg_lines = [
-        f'<svg width="{width}" height="{height}" viewBox="{min_x-10} {min_y-10} {width} {height}" '
-        'xmlns="http://www.w3.org/2000/svg">'
-    ]
+    # Every number in the document, header included, goes through the same
+    # precision-aware formatter
+    coord = _CoordStrings(precision)
+    width, height = coord[width], coord[height]
+    
+    w = out.write
+    w('<svg width="%s" height="%s" viewBox="%s %s %s %s" '
+      'xmlns="http://www.w3.org/2000/svg">\n' % (width, height, coord[min_x-10], coord[min_y-10], width, height))
     
     # Start underpainting group
-    svg_lines.append('<g id="underpainting">')
-    
-    # Draw edges with status colors if debug mode
-    for edge in framework.edges:
-        if not edge.status and not debug_mode:
-            continue
-            
-        x1, y1 = edge.point1.x, edge.point1.y
-        x2, y2 = edge.point2.x, edge.point2.y
+    w('<g id="underpainting">\n')
+    
+    # Draw edges with status colors if debug mode. Coordinates come from the
+    # xyz rows and statuses from the arrays, so no Point/Edge object is visited.
+    # One %-format per line over cached coordinate strings; np.char.mod formats
+    # element by element and was an order of magnitude slower here
+    edge_rows = np.arange(len(edge_status)) if debug_mode else np.flatnonzero(edge_status)
+    edge_xy = framework.xyz[framework.edge_pts[edge_rows], :2].reshape(-1, 4).tolist()
+    for (x1, y1, x2, y2), active in zip(edge_xy, edge_status[edge_rows].tolist()):
+        x1, y1, x2, y2 = coord[x1], coord[y1], coord[x2], coord[y2]
         
         if debug_mode:
-            color = "green" if edge.status else "red"
-            svg_lines.append(
-                f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" '
-                f'stroke="{color}" stroke-width="2" stroke-opacity="0.7"/>'
-            )
+            color = "green" if active else "red"
+            w('<line x1="%s" y1="%s" x2="%s" y2="%s" '
+              'stroke="%s" stroke-width="2" stroke-opacity="0.7"/>\n' % (x1, y1, x2, y2, color))
         else:
-            svg_lines.append(
-                f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" '
-                'stroke="black" stroke-width="1"/>'
-            )
+            w('<line x1="%s" y1="%s" x2="%s" y2="%s" '
+              'stroke="black" stroke-width="1"/>\n' % (x1, y1, x2, y2))
     
     # Draw points with status colors if debug mode
     if debug_mode:
-        for point in framework.points:
-            color = "green" if point.status else "red"
-            svg_lines.append(
-                f'<circle cx="{point.x}" cy="{point.y}" r="{radius/6}" '
-                f'fill="{color}" stroke="black" stroke-width="0.5"/>'
-            )
+        point_radius = coord[radius/6]
+        for (x, y), active in zip(xy.tolist(), point_status.tolist()):
+            color = "green" if active else "red"
+            w('<circle cx="%s" cy="%s" r="%s" '
+              'fill="%s" stroke="black" stroke-width="0.5"/>\n' % (coord[x], coord[y], point_radius, color))
     
     # Close underpainting group
-    svg_lines.append('</g>')
+    w('</g>\n')
     
     # Start final group (hextiles)
-    svg_lines.append('<g id="final">')
-    
-    # Create hextiles at each hexagon center
-    for face in framework.faces:
-        # Calculate hexagon center (average of all vertices)
-        x_coords = [edge.point1.x for edge in face.edges] + [edge.point2.x for edge in face.edges]
-        y_coords = [edge.point1.y for edge in face.edges] + [edge.point2.y for edge in face.edges]
-        cx = sum(x_coords) / len(x_coords)
-        cy = sum(y_coords) / len(y_coords)
-        
-        # Calculate average edge length for sizing
-        edge_lengths = [
-            math.sqrt((edge.point1.x - edge.point2.x)**2 + (edge.point1.y - edge.point2.y)**2)
-            for edge in face.edges
-        ]
-        edge_length = sum(edge_lengths) / len(edge_lengths)
-        
-        # Create tile with proper positioning and sizing
-        tile = HexTile(cx=cx, cy=cy, side_length=edge_length, path_width=edge_length/10)
-        
-        # Convert face status to hextile occupancy
-        binary_pattern = map_face_to_binary_array(face)
-        tile.occupancy = binary_pattern_to_hextile_occupancy(binary_pattern)
-        tile.creategeometry()
-        
+    w('<g id="final">\n')
+    
+    # Face centers and average edge lengths for all faces at once. Endpoints
+    # are gathered as (2, 6, F) so the sums over edges run in the same order
+    # as a per-face loop (all first points, then all second points).
+    # Faces are hexagons, as map_face_to_binary_array requires.
+    faces = list(framework.faces)
+    n_edges = 6
+    face_edges = np.array([[edge.index for edge in face.edges] for face in faces],
+                          dtype=np.intp).reshape(len(faces), n_edges)
+    ends = framework.xyz[framework.edge_pts[face_edges.T].transpose(2, 0, 1)]
+    xs, ys = ends[..., 0], ends[..., 1]
+    centers_x = xs.reshape(2 * n_edges, -1).sum(axis=0) / (2 * n_edges)
+    centers_y = ys.reshape(2 * n_edges, -1).sum(axis=0) / (2 * n_edges)
+    edge_lengths = np.sqrt((xs[0] - xs[1])**2 + (ys[0] - ys[1])**2)
+    side_lengths = edge_lengths.sum(axis=0) / n_edges
+    
+    # Convert face statuses to hextile occupancies, all faces at once
+    binary_patterns = map_faces_to_binary_arrays(framework, face_edges,
+                                                 point_status, edge_status)
+    occupancies = binary_patterns_to_hextile_occupancies(binary_patterns).tolist()
+    
+    # Create hextiles at each hexagon center. Tiles are independent, so with
+    # processes > 1 they are built in a process pool (results keep face order)
+    tile_args = zip(centers_x.tolist(), centers_y.tolist(), side_lengths.tolist(),
+                    occupancies, itertools.repeat(precision))
+    if processes == 1:
+        tile_svgs = map(_build_tile_svg, tile_args)
+    else:
+        workers = processes or os.cpu_count() or 1
+        with multiprocessing.Pool(workers) as pool:
+            tile_svgs = pool.map(_build_tile_svg, tile_args,
+                                 chunksize=max(1, len(faces) // (4 * workers)))
+    for tile_svg in tile_svgs:
         # Add the tile SVG to our output
-        svg_lines.append(tile.svgexport())
+        w(tile_svg)
+        w('\n')
     
     # Close final group
-    svg_lines.append('</g>')
+    w('</g>\n')
     
-    svg_lines.append('</svg>')
-    return '\n'.join(svg_lines)
+    w('</svg>')
 
 def binary_pattern_to_hextile_occupancy(binary_pattern):
     """
@@ -158,20 +218,28 @@ def binary_pattern_to_hextile_occupancy(binary_pattern):
     Returns:
         List[int]: 13-element hextile occupancy pattern
     """
-    # Center path (index 0) - average of point statuses (even indices)
-    center = 1 if sum(binary_pattern[::2]) / 6 > 0.5 else 0
-    
-    # Outer paths (indices 1-12) - interleave point and edge statuses
-    # Each point/edge gets two path segments for better visibility
-    outer_paths = []
-    for i in range(12):
-        # Alternate between point and edge statuses
-        src_index = (i // 2) % 6 * 2  # Points are at even indices
-        if i % 2 == 1:
-            src_index += 1  # Edges are at odd indices
-        outer_paths.append(binary_pattern[src_index % len(binary_pattern)])
-    
-    return [center] + outer_paths
+    # Center path (index 0) - on when more than half of the points (even
+    # indices) are active
+    center = 1 if sum(binary_pattern[::2]) > 3 else 0
+    
+    # Outer paths (indices 1-12) - the hextile slots alternate point and edge
+    # exactly like the pattern does, so slot i takes pattern value i
+    n = len(binary_pattern)
+    if n == 12:
+        return [center] + list(binary_pattern)
+    return [center] + [binary_pattern[i % n] for i in range(12)]
+
+def binary_patterns_to_hextile_occupancies(binary_patterns):
+    """
+    Converts an (F, 12) array of binary patterns to an (F, 13) array of hextile occupancies.
+    
+    Row-wise equivalent of binary_pattern_to_hextile_occupancy.
+    """
+    binary_patterns = np.asarray(binary_patterns, dtype=np.uint8)
+    occupancies = np.empty((len(binary_patterns), 13), dtype=np.uint8)
+    occupancies[:, 0] = binary_patterns[:, ::2].sum(axis=1) > 3
+    occupancies[:, 1:] = binary_patterns
+    return occupancies
 
 def map_face_to_binary_array(face):
     """
@@ -214,6 +282,43 @@ def map_face_to_binary_array(face):
     
     return binary_array
 
+def map_faces_to_binary_arrays(framework, face_edges, point_status=None, edge_status=None):
+    """
+    Converts the edge and point statuses of many faces into binary arrays at once.
+    Row-wise equivalent of map_face_to_binary_array.
+    
+    Args:
+        framework: PolygonFramework the faces belong to
+        face_edges: (F, 6) array of edge indices (Edge.index), in face order
+        point_status: Bool array of point statuses by row (default: framework.point_status)
+        edge_status: Bool array of edge statuses by row (default: framework.edge_status)
+        
+    Returns:
+        np.ndarray: (F, 12) uint8 array of statuses, points at even columns
+    """
+    face_edges = np.asarray(face_edges, dtype=np.intp)
+    ends = framework.edge_pts[face_edges]  # (F, 6, 2) point indices
+    
+    # Walk the edges of every face together, as map_face_to_binary_array does
+    # for one: restart from the edge's first point if the current point is
+    # not on it, record the point, then move to the edge's other point
+    point_order = np.empty(face_edges.shape, dtype=np.intp)
+    current = ends[:, 0, 0]
+    for k in range(face_edges.shape[1]):
+        first, second = ends[:, k, 0], ends[:, k, 1]
+        current = np.where((current == first) | (current == second), current, first)
+        point_order[:, k] = current
+        current = np.where(current == first, second, first)
+    
+    binary = np.empty((len(face_edges), 2 * face_edges.shape[1]), dtype=np.uint8)
+    if point_status is None:
+        point_status = framework.point_status
+    if edge_status is None:
+        edge_status = framework.edge_status
+    binary[:, 0::2] = np.asarray(point_status)[point_order]
+    binary[:, 1::2] = np.asarray(edge_status)[face_edges]
+    return binary
+
 # Example usage
 if __name__ == "__main__":
     file_path = r'C:\Users\Reference\Desktop\polyhex20250402d.svg'
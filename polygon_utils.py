@@ -1,3 +1,21 @@
+import numpy as np
+
+
+def _edge_key(point1, point2):
+    """Order-independent key for the edge between two point objects"""
+    return frozenset((id(point1), id(point2)))
+
+
+def _face_key(edges):
+    """Order-independent key for the face bounded by the given edge objects"""
+    return tuple(sorted(map(id, edges)))
+
+
+def _remove_identical(items, item):
+    """Remove item itself from items; list.remove would take the first equal element"""
+    del items[next(i for i, other in enumerate(items) if other is item)]
+
+
 class Point:
     def __init__(self, x, y, z, status=True):
         self.x = x
@@ -5,17 +23,18 @@ class Point:
         self.z = z
         self.status = status  # Active/inactive status
         self.edges = []  # List of edges that reference this point
+        self.index = None  # Position in the framework's points / xyz rows (if added)
+        # Coordinates quantized to 0.01; equality and hashing both use it
+        self._key = (round(x, 2), round(y, 2), round(z, 2))
+        self._hash = hash(self._key)
         
     def __eq__(self, other):
         if not isinstance(other, Point):
             return False
-        tolerance = 0.01
-        return (abs(self.x - other.x) <= tolerance and 
-                abs(self.y - other.y) <= tolerance and 
-                abs(self.z - other.z) <= tolerance)
+        return self._key == other._key
     
     def __hash__(self):
-        return hash((self.x, self.y, self.z))
+        return self._hash
     
     def __repr__(self):
         return f"Point({self.x}, {self.y}, {self.z}, status={self.status})"
@@ -24,6 +43,8 @@ class Point:
         self.x = x
         self.y = y
         self.z = z
+        self._key = (round(x, 2), round(y, 2), round(z, 2))
+        self._hash = hash(self._key)
 
 
 class Edge:
@@ -33,6 +54,8 @@ class Edge:
         self.status = status  # Active/inactive status
         self.faces = []  # List of faces that reference this edge
         self.midpoint = None  # Reference to midpoint (if exists)
+        self.index = None  # Position in the framework's edges / edge_pts rows (if added)
+        self._rehash()
         
         # Register this edge with its points
         point1.edges.append(self)
@@ -45,9 +68,13 @@ class Edge:
                (self.point1 == other.point2 and self.point2 == other.point1)
     
     def __hash__(self):
+        return self._hash
+    
+    def _rehash(self):
+        """Recompute the cached hash; call after the endpoints or their positions change"""
         # Order points consistently for hash
-        p1, p2 = sorted([hash(self.point1), hash(self.point2)])
-        return hash((p1, p2))
+        h1, h2 = hash(self.point1), hash(self.point2)
+        self._hash = hash((h1, h2) if h1 < h2 else (h2, h1))
     
     def __repr__(self):
         return f"Edge({self.point1}, {self.point2}, status={self.status})"
@@ -65,6 +92,9 @@ class Face:
     def __init__(self, edges, status=True):
         self.edges = edges  # List of edges that make up this face
         self.status = status  # Active/inactive status
+        self._key = _face_key(edges)  # Edge identities; equality and hashing use it
+        self._hash = hash(self._key)
+        self.index = None  # Position in the framework's faces list (if added)
         
         # Register this face with its edges
         for edge in edges:
@@ -73,10 +103,10 @@ class Face:
     def __eq__(self, other):
         if not isinstance(other, Face):
             return False
-        return set(self.edges) == set(other.edges)
+        return self._key == other._key
     
     def __hash__(self):
-        return hash(frozenset(self.edges))
+        return self._hash
     
     def __repr__(self):
         return f"Face({self.edges}, status={self.status})"
@@ -84,22 +114,105 @@ class Face:
 
 class PolygonFramework:
     def __init__(self):
-        self.points = set()
-        self.edges = set()
-        self.faces = set()
+        # Ordered storage: position i of points/edges/faces is the element
+        # whose .index is i, and the same row of the xyz/edge_pts arrays.
+        # Removal swaps the last element into the freed slot.
+        self.points = []
+        self.edges = []
+        self.faces = []
+        self._point_index = {}  # Point._key -> point
+        self._edge_index = {}  # Point id pair -> edge
+        self._face_map = {}  # Face._key -> face
+        # Set whenever a point is added or geometry is updated, cleared by
+        # merge_close_points. add_point only folds together points with the
+        # same 0.01 key, and float-noise copies of a vertex on a rounding
+        # boundary get different keys, so any new point can give the merge
+        # work. Only a repeated merge with nothing changed in between skips
+        # the KD-tree; a freshly built grid is always dirty
+        self._dirty_geometry = False
+        
+        # Structure-of-arrays mirror of the geometry: row i of _xyz holds the
+        # coordinates of points[i], row j of _edge_pts the point rows of
+        # edges[j]. Buffers grow by doubling.
+        self._xyz = np.empty((64, 3), dtype=np.float64)
+        self._edge_pts = np.empty((64, 2), dtype=np.int32)
+    
+    # Array views
+    @property
+    def xyz(self):
+        """(N, 3) array of point coordinates, row i belonging to points[i]"""
+        return self._xyz[:len(self.points)]
+    
+    @property
+    def edge_pts(self):
+        """(E, 2) array of point indices, row j belonging to edges[j]"""
+        return self._edge_pts[:len(self.edges)]
+    
+    @property
+    def point_status(self):
+        """(N,) bool array of point statuses, in points order"""
+        return np.fromiter((p.status for p in self.points), dtype=bool, count=len(self.points))
+    
+    @point_status.setter
+    def point_status(self, statuses):
+        for point, status in zip(self.points, np.asarray(statuses, dtype=bool).tolist()):
+            point.status = status
+    
+    @property
+    def edge_status(self):
+        """(E,) bool array of edge statuses, in edges order"""
+        return np.fromiter((e.status for e in self.edges), dtype=bool, count=len(self.edges))
+    
+    @edge_status.setter
+    def edge_status(self, statuses):
+        for edge, status in zip(self.edges, np.asarray(statuses, dtype=bool).tolist()):
+            edge.status = status
+    
+    # Membership, by position rather than equality
+    def _has(self, items, item):
+        """Check that item sits at its own index in items"""
+        i = item.index
+        return i is not None and i < len(items) and items[i] is item
+    
+    def _append(self, items, item):
+        """Append item to items and record its position"""
+        item.index = len(items)
+        items.append(item)
+    
+    def _swap_remove(self, items, item):
+        """Remove item from items by moving the last element into its slot; return the moved element"""
+        i = item.index
+        last = items.pop()
+        item.index = None
+        if last is item:
+            return None
+        items[i] = last
+        last.index = i
+        return last
+    
+    def _set_edge_row(self, edge):
+        """Write an edge's point indices into its edge_pts row"""
+        if edge.index is not None:
+            self._edge_pts[edge.index] = (edge.point1.index, edge.point2.index)
     
     # Point operations
     def add_point(self, point):
         """Add a point if it doesn't already exist"""
-        if point in self.points:
-            existing = next(p for p in self.points if p == point)
+        existing = self._point_index.setdefault(point._key, point)
+        if existing is not point:
             return existing
-        self.points.add(point)
+        
+        i = len(self.points)
+        if i == len(self._xyz):
+            self._xyz = np.concatenate([self._xyz, np.empty_like(self._xyz)])
+        self._xyz[i] = (point.x, point.y, point.z)
+        self._append(self.points, point)
+        self._dirty_geometry = True
         return point
     
     def remove_point(self, point):
         """Remove a point and all edges/faces that reference it"""
-        if point not in self.points:
+        if not self._has(self.points, point):
             return False
         
         # Find all edges connected to this point
@@ -109,40 +222,56 @@ class PolygonFramework:
         for edge in connected_edges:
             self.remove_edge(edge)
         
-        self.points.remove(point)
+        if self._point_index.get(point._key) is point:
+            del self._point_index[point._key]
+        i = point.index
+        moved = self._swap_remove(self.points, point)
+        if moved is not None:
+            self._xyz[i] = self._xyz[len(self.points)]
+            for edge in moved.edges:
+                self._set_edge_row(edge)
         return True
     
     def update_point(self, point, x, y, z):
         """Update a point's position"""
-        if point in self.points:
-            point.update_position(x, y, z)
-            return True
-        return False
+        if not self._has(self.points, point):
+            return False
+        
+        if self._point_index.get(point._key) is point:
+            del self._point_index[point._key]
+        point.update_position(x, y, z)
+        self._dirty_geometry = True
+        self._point_index.setdefault(point._key, point)
+        self._xyz[point.index] = (x, y, z)
+        
+        # Edge hashes are built from their points' hashes
+        for edge in point.edges:
+            edge._rehash()
+        return True
     
     # Edge operations
     def add_edge(self, point1, point2):
-        """Add an edge between two points if it doesn't exist (checks both point orders)"""
-        # First check if both points exist in the framework
-        existing_p1 = next((p for p in self.points if p == point1), None)
-        existing_p2 = next((p for p in self.points if p == point2), None)
-        
-        if not existing_p1 or not existing_p2:
-            raise ValueError("Both points must exist in the framework before creating an edge")
-        
-        # Now check if an edge already exists between these points (in either order)
-        for edge in self.edges:
-            if (edge.point1 == existing_p1 and edge.point2 == existing_p2) or \
-            (edge.point1 == existing_p2 and edge.point2 == existing_p1):
-                return edge
-        
-        # If we get here, the edge doesn't exist - create it with the existing points
-        edge = Edge(existing_p1, existing_p2)
-        self.edges.add(edge)
+        """Add an edge between two points if it doesn't exist (checks both point orders).
+        The points must be the ones returned by add_point."""
+        key = _edge_key(point1, point2)
+        edge = self._edge_index.get(key)
+        if edge is None:
+            # An indexed edge's points are already the framework's own, so
+            # only a new edge needs checking; its edge_pts row needs both rows
+            for point in (point1, point2):
+                if not self._has(self.points, point):
+                    raise ValueError(f"Both points must exist in the framework before creating an edge: {point!r}")
+            edge = Edge(point1, point2)
+            self._edge_index[key] = edge
+            if len(self.edges) == len(self._edge_pts):
+                self._edge_pts = np.concatenate([self._edge_pts, np.empty_like(self._edge_pts)])
+            self._append(self.edges, edge)
+            self._set_edge_row(edge)
         return edge
     
     def remove_edge(self, edge):
         """Remove an edge and all faces that reference it"""
-        if edge not in self.edges:
+        if not self._has(self.edges, edge):
             return False
         
         # Find all faces connected to this edge
@@ -153,28 +282,40 @@ class PolygonFramework:
             self.remove_face(face)
         
         # Remove edge from its points' edge lists
-        edge.point1.edges.remove(edge)
-        edge.point2.edges.remove(edge)
+        _remove_identical(edge.point1.edges, edge)
+        _remove_identical(edge.point2.edges, edge)
         
-        self.edges.remove(edge)
+        key = _edge_key(edge.point1, edge.point2)
+        if self._edge_index.get(key) is edge:
+            del self._edge_index[key]
+        j = edge.index
+        if self._swap_remove(self.edges, edge) is not None:
+            self._edge_pts[j] = self._edge_pts[len(self.edges)]
         return True
     
     def update_edge(self, edge, new_point1, new_point2):
         """Update an edge's points"""
-        if edge not in self.edges:
+        if not self._has(self.edges, edge):
             return False
         
         # Remove old references
-        edge.point1.edges.remove(edge)
-        edge.point2.edges.remove(edge)
+        _remove_identical(edge.point1.edges, edge)
+        _remove_identical(edge.point2.edges, edge)
+        key = _edge_key(edge.point1, edge.point2)
+        if self._edge_index.get(key) is edge:
+            del self._edge_index[key]
         
         # Update points
         edge.point1 = new_point1
         edge.point2 = new_point2
+        edge._rehash()
+        self._dirty_geometry = True
         
         # Add new references
         new_point1.edges.append(edge)
         new_point2.edges.append(edge)
+        self._edge_index.setdefault(_edge_key(new_point1, new_point2), edge)
+        self._set_edge_row(edge)
         
         return True
     
@@ -183,83 +324,154 @@ class PolygonFramework:
         """Add a face with the given edges"""
         # Check if all edges exist in the framework
         for edge in edges:
-            if edge not in self.edges:
+            if not self._has(self.edges, edge):
                 raise ValueError("All edges must exist in the framework before creating a face")
         
-        face = Face(edges)
-        if face in self.faces:
-            existing = next(f for f in self.faces if f == face)
+        existing = self._face_map.get(_face_key(edges))
+        if existing is not None:
             return existing
-        self.faces.add(face)
+        face = Face(edges)
+        self._face_map[face._key] = face
+        self._append(self.faces, face)
         return face
     
     def remove_face(self, face):
         """Remove a face"""
-        if face not in self.faces:
+        if not self._has(self.faces, face):
             return False
         
         # Remove face from its edges' face lists
         for edge in face.edges:
-            edge.faces.remove(face)
+            _remove_identical(edge.faces, face)
         
-        self.faces.remove(face)
+        if self._face_map.get(face._key) is face:
+            del self._face_map[face._key]
+        self._swap_remove(self.faces, face)
         return True
     
     def update_face(self, face, new_edges):
         """Update a face's edges"""
-        if face not in self.faces:
+        if not self._has(self.faces, face):
             return False
         
         # Remove old references
         for edge in face.edges:
-            edge.faces.remove(face)
+            _remove_identical(edge.faces, face)
+        if self._face_map.get(face._key) is face:
+            del self._face_map[face._key]
         
         # Update edges
         face.edges = new_edges
+        face._key = _face_key(new_edges)
+        face._hash = hash(face._key)
+        self._dirty_geometry = True
         
         # Add new references
         for edge in new_edges:
             edge.faces.append(face)
+        self._face_map.setdefault(face._key, face)
         
         return True
     
     def merge_close_points(self, tolerance=1e-6):
         """
-        Merge points that are closer than specified tolerance
+        Merge points that are closer than specified tolerance, and the edges
+        that become duplicates by joining the same two points.
+        Does nothing if no point was added or updated since the last merge.
         :param tolerance: Maximum distance to consider points the same
         :return: Number of points merged
         """
-        original_count = len(self.points)
-        points_list = list(self.points)
+        # Newly built geometry is always dirty (see __init__), so this only
+        # saves a repeated merge
+        if not self._dirty_geometry:
+            return 0
+        self._dirty_geometry = False
+        
+        points_list = self.points
+        n = len(points_list)
         
         # Create a spatial index for faster proximity checks
         from scipy.spatial import KDTree
-        coords = [(p.x, p.y, p.z) for p in points_list]
-        tree = KDTree(coords)
+        tree = KDTree(self.xyz)
         
         # Find all point pairs within tolerance
         pairs = tree.query_pairs(tolerance)
+        if not pairs:
+            return 0
         
-        # Process pairs to find connected components
-        merged = set()
+        # Union-find over the pairs, so chains of close points end up in one
+        # cluster whatever order the pairs come in
+        parent = list(range(n))
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
         for i, j in pairs:
-            if i not in merged and j not in merged:
-                # Keep the first point, merge others into it
-                keeper = points_list[i]
-                to_merge = points_list[j]
-                
-                # Update all edges referencing to_merge
-                for edge in list(to_merge.edges):
-                    if edge.point1 == to_merge:
-                        edge.point1 = keeper
-                    if edge.point2 == to_merge:
-                        edge.point2 = keeper
-                    keeper.edges.append(edge)
-                
-                merged.add(j)
-                self.points.remove(to_merge)
-        
-        return original_count - len(self.points)
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                # Keep the lower row as the cluster's point
+                if root_j < root_i:
+                    root_i, root_j = root_j, root_i
+                parent[root_j] = root_i
+        roots = np.array([find(i) for i in range(n)], dtype=np.int32)
+        keep = roots == np.arange(n)
+        merged_rows = np.flatnonzero(~keep).tolist()
+        
+        # Point every edge at its cluster's kept point
+        for i in merged_rows:
+            keeper = points_list[roots[i]]
+            to_merge = points_list[i]
+            for edge in to_merge.edges:
+                if edge.point1 is to_merge:
+                    edge.point1 = keeper
+                if edge.point2 is to_merge:
+                    edge.point2 = keeper
+                edge._rehash()
+                keeper.edges.append(edge)
+            to_merge.edges = []
+            to_merge.index = None
+            
+            if self._point_index.get(to_merge._key) is to_merge:
+                self._point_index[to_merge._key] = keeper
+        
+        # Compact the arrays: drop merged rows and remap edge endpoints
+        # through their cluster roots in one gather
+        new_rows = np.cumsum(keep, dtype=np.int32) - 1
+        m = n - len(merged_rows)
+        self._xyz[:m] = self.xyz[keep]
+        self._edge_pts[:len(self.edges)] = new_rows[roots[self.edge_pts]]
+        self.points = [point for point, kept in zip(points_list, keep.tolist()) if kept]
+        for i, point in enumerate(self.points):
+            point.index = i
+        
+        # Edge endpoints changed, so rebuild the edge index. Edges between
+        # copies of the same two points are now duplicates of each other
+        self._edge_index = {}
+        duplicates = []
+        for edge in self.edges:
+            survivor = self._edge_index.setdefault(_edge_key(edge.point1, edge.point2), edge)
+            if survivor is not edge:
+                duplicates.append((edge, survivor))
+        
+        # Hand the duplicates' faces to the surviving edge, then drop them
+        for edge, survivor in duplicates:
+            for face in edge.faces:
+                if self._face_map.get(face._key) is face:
+                    del self._face_map[face._key]
+                face.edges = [survivor if e is edge else e for e in face.edges]
+                face._key = _face_key(face.edges)
+                face._hash = hash(face._key)
+                self._face_map.setdefault(face._key, face)
+                survivor.faces.append(face)
+            edge.faces = []
+            _remove_identical(edge.point1.edges, edge)
+            _remove_identical(edge.point2.edges, edge)
+            j = edge.index
+            if self._swap_remove(self.edges, edge) is not None:
+                self._edge_pts[j] = self._edge_pts[len(self.edges)]
+        
+        return len(merged_rows)
 
 
 
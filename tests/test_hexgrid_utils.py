@@ -0,0 +1,32 @@
+import random
+
+import hexgrid_utils
+from hexgrid_utils import cube_line
+
+
+def _random_cube(rng, spread=40):
+    q, r = rng.randint(-spread, spread), rng.randint(-spread, spread)
+    return (q, r, -q - r)
+
+
+def test_cube_line_kernel_matches_python_walk():
+    rng = random.Random(0)
+    for _ in range(500):
+        a, b = _random_cube(rng), _random_cube(rng)
+        assert cube_line(a, b) == hexgrid_utils._cube_line_walk(*a, *b)
+
+
+def test_cube_line_is_contiguous_between_its_endpoints():
+    rng = random.Random(1)
+    for _ in range(500):
+        a, b = _random_cube(rng), _random_cube(rng)
+        line = cube_line(a, b)
+        assert line[0] == a and line[-1] == b
+        assert len(line) == hexgrid_utils.cube_distance(a, b) + 1
+        for h1, h2 in zip(line, line[1:]):
+            assert hexgrid_utils.cube_distance(h1, h2) == 1
+
+
+def test_cube_line_of_one_hex():
+    assert cube_line((2, -3, 1), (2, -3, 1)) == [(2, -3, 1)]
+    assert hexgrid_utils.axial_line((2, -3), (2, -3)) == [(2, -3)]
@@ -0,0 +1,18 @@
+import numpy as np
+
+from hextile_utils import gap_path_indices, shift_and_find_zero_groups
+
+
+def test_zero_groups_of_uint8_occupancy():
+    occupancy = [1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1]
+    expected = ((1,), (3,), (5,), (7,), (9,))
+    assert shift_and_find_zero_groups(occupancy) == expected
+    assert shift_and_find_zero_groups(np.array(occupancy, dtype=np.uint8)) == expected
+
+
+def test_gap_paths_cache_shared_between_uint8_and_list():
+    occupancy = [1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1]
+    from_array = gap_path_indices(np.array(occupancy, dtype=np.uint8))
+    assert gap_path_indices(occupancy) == from_array
+    assert from_array == [((0, 1), (0, 1)), ((2, 3), (2, 3)), ((4, 5), (4, 5)),
+                          ((6, 7), (6, 7)), ((8, 9), (8, 9))]
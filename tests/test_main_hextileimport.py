@@ -0,0 +1,12 @@
+import re
+
+from main_hextileimport import create_hexagon_grid
+
+
+def test_precision_applies_to_the_whole_document(tmp_path):
+    path = tmp_path / "grid.svg"
+    create_hexagon_grid(20, 3, 3, str(path), debug_mode=True, precision=2)
+    numbers = re.findall(r'\s(?:width|height|viewBox|x1|y1|x2|y2|cx|cy|r)="([^"]*)"', path.read_text())
+    assert numbers
+    for value in " ".join(numbers).split():
+        assert re.fullmatch(r"-?\d+\.\d{2}", value), value
@@ -0,0 +1,91 @@
+import pytest
+
+import main_hextileimport
+from polygon_utils import Point, PolygonFramework
+
+
+def test_merge_joins_noise_copies_across_a_rounding_boundary():
+    # 14.945 and 14.944999999999999 quantize to different 0.01 keys, so
+    # add_point keeps both and only merge_close_points can join them
+    framework = PolygonFramework()
+    a = framework.add_point(Point(14.945, 0, 0))
+    b = framework.add_point(Point(14.944999999999999, 0, 0))
+    assert a is not b
+    assert framework.merge_close_points() == 1
+    assert len(framework.points) == 1
+
+
+def test_grid_on_rounding_boundary_merges_shared_vertices(tmp_path):
+    rows = cols = 12
+    framework = main_hextileimport.create_hexagon_grid(14.945, rows, cols, str(tmp_path / "grid.svg"))
+    # Vertex and edge counts of an odd-r pointy-top grid
+    assert len(framework.points) == 2 * (rows + 1) * (cols + 1) - 2
+    assert len(framework.edges) == 3 * rows * cols + 2 * rows + 2 * cols - 1
+    # Each edge between two tiles is a single object owned by both faces
+    shared = [edge for edge in framework.edges if len(edge.faces) == 2]
+    assert len(shared) == 3 * rows * cols - 2 * rows - 2 * cols + 1
+    assert all(len(edge.faces) <= 2 for edge in framework.edges)
+    for edge in shared:
+        for face in edge.faces:
+            assert sum(e is edge for e in face.edges) == 1
+
+
+def test_merge_skipped_when_nothing_changed():
+    framework = PolygonFramework()
+    framework.add_point(Point(14.945, 0, 0))
+    framework.add_point(Point(14.944999999999999, 0, 0))
+    assert framework.merge_close_points() == 1
+    assert not framework._dirty_geometry
+    assert framework.merge_close_points() == 0
+
+
+def test_remove_edge_removes_that_edge_when_an_equal_one_exists():
+    framework = PolygonFramework()
+    a = framework.add_point(Point(0, 0, 0))
+    b = framework.add_point(Point(1, 0, 0))
+    c = framework.add_point(Point(0, 1, 0))
+    e1 = framework.add_edge(a, b)
+    e2 = framework.add_edge(a, c)
+    framework.update_edge(e2, a, b)  # e1 == e2 from here on
+    framework.remove_edge(e2)
+    assert any(edge is e1 for edge in a.edges)
+    assert not any(edge is e2 for edge in a.edges)
+
+    framework.remove_point(c)
+    framework.remove_point(a)
+    assert framework.edges == []
+    assert framework.points == [b]
+    assert b.index == 0 and b.edges == []
+
+
+def test_merge_joins_edges_that_become_duplicates():
+    # Two squares sharing their middle edge, whose vertices are float-noise
+    # copies on either side of a 0.01 rounding boundary
+    framework = PolygonFramework()
+    x, x_noise = 14.945, 14.944999999999999
+
+    def square(x0, x1):
+        corners = [framework.add_point(Point(*xy, 0)) for xy in ((x0, 0), (x1, 0), (x1, 1), (x0, 1))]
+        return framework.add_face([framework.add_edge(corners[i], corners[(i + 1) % 4]) for i in range(4)])
+
+    left = square(0, x)
+    right = square(x_noise, 30)
+    assert len(framework.edges) == 8
+    assert framework.merge_close_points() == 2
+
+    assert len(framework.points) == 6
+    assert len(framework.edges) == 7
+    (shared,) = [edge for edge in left.edges if any(edge is e for e in right.edges)]
+    assert len(shared.faces) == 2
+    assert all(framework.edges[edge.index] is edge for edge in framework.edges)
+    assert (framework.edge_pts == [(e.point1.index, e.point2.index) for e in framework.edges]).all()
+    assert framework._face_map[left._key] is left and framework._face_map[right._key] is right
+
+
+def test_add_edge_rejects_a_point_not_in_the_framework():
+    framework = PolygonFramework()
+    a = framework.add_point(Point(0, 0, 0))
+    stray = Point(1, 0, 0)
+    with pytest.raises(ValueError, match=r"Point\(1, 0, 0"):
+        framework.add_edge(a, stray)
+    assert framework.edges == [] and a.edges == []